@@ -21,12 +21,53 @@
 
 import renpy.config as config
 import renpy.exports as renpy
-from renpy.minstore import _dict, _object
+from renpy.minstore import _dict, _list, _object, basestring, PY2
 
 """renpy
 init -1200 python:
 """
 
+import json as _json
+import os as _os
+
+# The types of the values that can be stored in a JSONDB without further
+# checking.
+if PY2:
+    _jsondb_scalars = (basestring, int, long, float) # type: ignore
+else:
+    _jsondb_scalars = (basestring, int, float)
+
+def _jsondb_check(value):
+    """
+    Raises an exception if `value` contains anything that can't be stored
+    in a JSONDB.
+
+    Scalars are checked inline, so only containers recurse. A circular
+    reference recurses until it raises RecursionError.
+    """
+
+    if isinstance(value, _dict):
+
+        for k, v in value.items():
+            if not isinstance(k, basestring):
+                raise TypeError
+
+            if v is None or isinstance(v, _jsondb_scalars):
+                continue
+
+            _jsondb_check(v)
+
+    elif isinstance(value, (_list, tuple)):
+
+        for v in value:
+            if v is None or isinstance(v, _jsondb_scalars):
+                continue
+
+            _jsondb_check(v)
+
+    elif not (value is None or isinstance(value, _jsondb_scalars)):
+        raise TypeError
+
 class _JSONDBDict(_dict):
 
     def __init__(self, *args, **kwargs):
@@ -46,10 +87,8 @@ class _JSONDBDict(_dict):
         if not config.developer:
             raise RuntimeError("A JSONDB can only be modified when config.developer is True.")
 
-        import json
-
         try:
-            json.dumps(value)
+            _jsondb_check(value)
         except Exception:
             raise TypeError("The data {!r} is not JSON serializable.".format(value))
 
@@ -176,8 +215,9 @@ class JSONDB(_object):
         # The filename the database is stored in.
         self.fn = filename
 
-        # The data contained in the database.
-        self.data = { }
+        # The data contained in the database, or None if the database
+        # hasn't been loaded yet. Use the data property to access it.
+        self._data = None
 
         # True of the database as a whole needs to be saved. There are
         # also dirty flags for each entry, the database is saved if
@@ -190,56 +230,129 @@ class JSONDB(_object):
         else:
             self.default = { }
 
+        # The most recently accessed key, and the second level dictionary
+        # it maps to. This speeds up repeated accesses to the same key,
+        # like those made through the dialogue property.
+        self._last_key = None
+        self._last_dict = None
+
         # Schedule the database to be saved when the game quits.
         config.at_exit_callbacks.append(self.save)
 
-        # Load the database.
-        import json
+    def _load(self):
+        """
+        Loads the database from disk. This is done the first time the data
+        is accessed, so databases that are never used aren't loaded.
+        """
 
-        if not renpy.loadable(self.fn):
-            return
+        rv = { }
+
+        if renpy.loadable(self.fn):
+
+            with renpy.open_file(self.fn, "utf-8") as f:
+                data = _json.load(f)
+
+            for k, v in data.items():
+                d = _JSONDBDict(v)
 
-        with renpy.open_file(self.fn, "utf-8") as f:
-            data = json.load(f)
+                d.dirty = False
+                d.changed = True
 
-        for k, v in data.items():
-            d = _JSONDBDict(v)
+                rv[k] = d
 
-            d.dirty = False
-            d.changed = True
+        self._data = rv
 
-            self.data[k] = d
+    @property
+    def data(self):
+        if self._data is None:
+            self._load()
+
+        return self._data
 
     def save(self):
 
-        if not(self.dirty or any(i.dirty for i in self.data.values())):
+        # If the database was never loaded, it can't have been changed.
+        if self._data is None:
+            return
+
+        db = self._data
+
+        if not(self.dirty or any(i.dirty for i in db.values())):
             return
 
-        d = { k : v for k, v in self.data.items() if v.changed }
+        d = { k : v for k, v in db.items() if v.changed }
+
+        # Keys are sorted at every level, so the file doesn't depend on the
+        # order entries were created or changed in, which keeps version
+        # control diffs small.
+        text = _json.dumps(d, indent=4, separators=(",", ": "), sort_keys=True)
+
+        # The file is written in binary mode, so it can be compared with the
+        # one on disk. Use the platform's line endings, as text mode would.
+        text = text.replace("\n", _os.linesep).encode("utf-8")
+
+        fn = _os.path.join(config.gamedir, self.fn)
+
+        if not self._file_matches(fn, text):
+
+            with open(fn + ".new", "wb") as f:
+                f.write(text)
 
-        import os, json
+                # Make sure the new file is on disk before it replaces the old one.
+                f.flush()
+                _os.fsync(f.fileno())
 
-        fn = os.path.join(config.gamedir, self.fn)
+            if PY2:
+                try:
+                    _os.rename(fn + ".new", fn)
+                except Exception:
+                    _os.remove(fn)
+                    _os.rename(fn + ".new", fn)
+            else:
+                _os.replace(fn + ".new", fn)
+
+        self.dirty = False
 
-        with open(fn + ".new", "w") as f:
-            json.dump(d, f, indent=4, sort_keys=True)
+        for i in db.values():
+            i.dirty = False
+
+    def _file_matches(self, fn, text):
+        """
+        Returns True if the file `fn` exists and contains exactly `text`,
+        in which case it doesn't need to be written.
+        """
 
         try:
-            os.rename(fn + ".new", fn)
+            if _os.path.getsize(fn) != len(text):
+                return False
+
+            with open(fn, "rb") as f:
+                return f.read() == text
+
         except Exception:
-            os.remove(fn)
-            os.rename(fn + ".new", fn)
+            return False
 
     def __getitem__(self, key):
 
-        if key not in self.data:
-            self.data[key] = _JSONDBDict(self.default.copy())
+        if self._last_dict is not None and key == self._last_key:
+            return self._last_dict
+
+        rv = self.data.get(key, None)
+
+        if rv is None:
+            rv = self.data[key] = _JSONDBDict(self.default.copy())
 
-        return self.data[key]
+        self._last_key = key
+        self._last_dict = rv
+
+        return rv
 
     def __delitem__(self, key):
         del self.data[key]
 
+        self._last_key = None
+        self._last_dict = None
+
         self.dirty = True
 
     def __setitem__(self, key, value):
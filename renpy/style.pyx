@@ -25,6 +25,8 @@ from cpython.ref cimport PyObject, Py_XDECREF
 from libc.string cimport memset
 from libc.stdlib cimport calloc, free
 
+import sys
+
 import renpy
 
 include "styleconstants.pxi"
@@ -655,9 +657,10 @@ Style = StyleCore
 
 from renpy.styledata.stylesets import all_properties, prefix_priority, prefix_alts, property_priority
 
-# The set of all prefixed properties we know about.
+# The set of all prefixed properties we know about. These are interned, as
+# they're looked up using attribute names, which Python interns.
 prefixed_all_properties = {
-    prefix + propname
+    sys.intern(prefix + propname)
     for prefix in prefix_priority
     for propname in all_properties
     }
@@ -750,7 +753,7 @@ cpdef unbuild_style(StyleCore s):
 # A map from prefixed property to priority.
 priority = None
 
-# A map from prefixed property to the prefixed properties it affects.
+# A map from prefixed property to a tuple of the prefixed properties it affects.
 affects = None
 
 def init_inspect():
@@ -766,8 +769,10 @@ def init_inspect():
 
     for prefixname, pri in prefix_priority.items():
         for propname, proplist in all_properties.items():
-            priority[prefixname + propname] = pri + property_priority.get(propname, 0)
-            affects[prefixname + propname] = [ a + i for a in prefix_alts[prefixname] for i in proplist ]
+            name = sys.intern(prefixname + propname)
+
+            priority[name] = pri + property_priority.get(propname, 0)
+            affects[name] = tuple(sys.intern(a + i) for a in prefix_alts[prefixname] for i in proplist)
 
 
 ################################################################################
@@ -862,6 +867,6 @@ all_properties : dict[str, list[str]]
 prefix_priority : dict[str, int]
 prefix_alts : dict[str, list[str]]
 prefix_search : dict[str, list[str]]
-affects : dict[str, list[str]]
+affects : dict[str, tuple[str, ...]]
 styles: dict[str, Any]
 """